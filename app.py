@@ -1,4 +1,5 @@
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
 import pandas as pd
 
@@ -22,6 +23,39 @@ def hide_streamlit_style():
     """
     st.markdown(hide_style, unsafe_allow_html=True)
 
+# --- Cached Data Loading ---
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_table(table_name: str, region: str, _client) -> pd.DataFrame:
+    """
+    Scans a whole DynamoDB table (used for accounts), caching the result for 5 minutes.
+    The cache is keyed on (table_name, region); the leading underscore keeps
+    the client (and the credentials inside it) out of the cache key.
+    """
+    return report_generator.get_data_from_dynamodb(
+        table_name,
+        client=_client,
+        projection=report_generator.TABLE_PROJECTIONS.get(table_name),
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_and_coerce(
+    table_name: str, region: str, _client, start_dt: pd.Timestamp, end_dt: pd.Timestamp
+) -> pd.DataFrame:
+    """
+    Scans a log table, parses createdAt and encodes the count columns once, so reruns only filter.
+    Scans directly rather than via _load_table so only the prepared frame is kept in the cache.
+    """
+    df = report_generator.get_data_from_dynamodb(
+        table_name,
+        client=_client,
+        start_ts=start_dt,
+        end_ts=end_dt,
+        projection=report_generator.TABLE_PROJECTIONS.get(table_name),
+    )
+    # The scan result is a fresh frame owned here, so it is safe to mutate.
+    df = report_generator.coerce_created_at(df, inplace=True)
+    return report_generator.encode_log_columns(df)
+
 # --- Page Configuration ---
 # This should be the first Streamlit command in your script
 st.set_page_config(
@@ -83,12 +117,24 @@ if generate_button:
     with st.spinner("Fetching data from DynamoDB and building report..."):
         try:
             # 1. Fetch data using your existing functions
-            access_key, secret_key, region = report_generator.load_env_credentials()
-            accounts_df = report_generator.get_data_from_dynamodb(report_generator.TABLE_ACCOUNTS, access_key, secret_key, region)
-            usage_df_all = report_generator.get_data_from_dynamodb(report_generator.TABLE_USAGE, access_key, secret_key, region)
-            askai_df_all = report_generator.get_data_from_dynamodb(report_generator.TABLE_ASKAI, access_key, secret_key, region)
-
-            # 2. Filter data by the selected date range
+            # The three scans are independent network I/O, so run them concurrently.
+            # One process-wide client, so reruns and sessions reuse the same connection pool.
+            client = report_generator.get_dynamodb_client()
+            region = client.meta.region_name
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                fut_accounts = executor.submit(_load_table, report_generator.TABLE_ACCOUNTS, region, client)
+                # Log tables are filtered to the selected range server-side; accounts are always scanned whole.
+                fut_usage = executor.submit(
+                    _load_and_coerce, report_generator.TABLE_USAGE, region, client, start_dt, end_dt
+                )
+                fut_askai = executor.submit(
+                    _load_and_coerce, report_generator.TABLE_ASKAI, region, client, start_dt, end_dt
+                )
+                accounts_df = fut_accounts.result()
+                usage_df_all = fut_usage.result()
+                askai_df_all = fut_askai.result()
+
+            # 2. Filter data by the selected date range (createdAt is already parsed)
             usage_df = report_generator.filter_by_date(usage_df_all, start_dt, end_dt)
             askai_df = report_generator.filter_by_date(askai_df_all, start_dt, end_dt)
 
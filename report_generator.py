@@ -2,12 +2,23 @@ import io
 import streamlit as st
 import os
 import argparse
+import functools
+import glob
+import hashlib
+import inspect
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, UTC
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
+from xml.sax.saxutils import escape
 
 import boto3
+import numpy as np
 import pandas as pd
+from boto3.dynamodb.types import TypeDeserializer
 from botocore.config import Config
 from dotenv import load_dotenv
 
@@ -27,6 +38,11 @@ METRICS_USAGE_TYPE_MAP: Dict[str, List[str]] = {
     "Regenerated Notes": ["regenerate note"],
 }
 
+# Reverse lookup used to pivot usage rows straight into metric columns.
+USAGE_TYPE_TO_METRIC: Dict[str, str] = {
+    usage_type: metric for metric, usage_types in METRICS_USAGE_TYPE_MAP.items() for usage_type in usage_types
+}
+
 TABLE_ACCOUNTS = "oak-account-vtc"
 TABLE_USAGE = "oak-usage-log-vtc"
 TABLE_ASKAI = "oak-ask-ai-vtc"
@@ -46,6 +62,34 @@ CREATED_AT_ALIASES: List[str] = [
     "created_at_ms", "created_at_iso",
 ]
 
+# Fast path for OAK's integer-millisecond createdAt in coerce_created_at.
+# Set OAK_FAST_DATETIME=0 to force the generic parser if the schema drifts.
+OAK_FAST_DATETIME = os.getenv("OAK_FAST_DATETIME", "1") != "0"
+
+# Attributes each table's scan needs to project; aliases an item lacks are simply omitted by DynamoDB.
+TABLE_PROJECTIONS: Dict[str, List[str]] = {
+    TABLE_ACCOUNTS: ACCOUNT_ALIASES + USERNAME_ALIASES,
+    TABLE_USAGE: ACCOUNT_ALIASES + USAGE_TYPE_ALIASES + CREATED_AT_ALIASES,
+    TABLE_ASKAI: ACCOUNT_ALIASES + CREATED_AT_ALIASES,
+}
+
+# Column roles resolved once per scan result (see resolve_columns).
+COLUMN_ALIASES: Dict[str, List[str]] = {
+    "account": ACCOUNT_ALIASES,
+    "username": USERNAME_ALIASES,
+    "usage_type": USAGE_TYPE_ALIASES,
+    "created_at": CREATED_AT_ALIASES,
+}
+
+# Internal column holding the normalized (stripped, lower-cased) account key.
+ACCOUNT_KEY = "_acct"
+
+# Opt-in on-disk parquet cache for DynamoDB scans, so restarts/deploys don't force a fresh scan.
+# Disabled unless VTC_SCAN_CACHE_TTL is set to a positive number of seconds (read per scan, see
+# _scan_cache_settings). Cached files hold account emails/usernames in plaintext, so point
+# VTC_SCAN_CACHE_DIR somewhere private.
+DEFAULT_SCAN_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".scan_cache")
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -116,25 +160,229 @@ def load_env_credentials() -> Tuple[str, str, str]:
     return access_key, secret_key, region
 
 
-def get_data_from_dynamodb(table_name: str, access_key: str, secret_key: str, region: str) -> pd.DataFrame:
-    """Scan a DynamoDB table and return results as a pandas DataFrame."""
-    session = boto3.session.Session(
-        aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region
-    )
-    dynamodb = session.resource("dynamodb", config=Config(retries={"max_attempts": 10, "mode": "standard"}))
-    table = dynamodb.Table(table_name)
+class _NativeNumberDeserializer(TypeDeserializer):
+    """Deserializes DynamoDB Numbers to int/float instead of Decimal, so pandas gets int64/float64 columns."""
+
+    def _deserialize_n(self, value):
+        if "." in value or "e" in value or "E" in value:
+            return float(value)
+        return int(value)
+
+
+_DESERIALIZER = _NativeNumberDeserializer()
+
+
+def _deserialize_item(item: dict) -> dict:
+    return {k: _DESERIALIZER.deserialize(v) for k, v in item.items()}
+
+
+def _scan_segment(
+    client, table_name: str, segment: int, total_segments: int, extra_kwargs: Optional[Dict[str, object]] = None
+) -> List[dict]:
+    """Scan one segment of a parallel DynamoDB scan, following pagination."""
     items: List[dict] = []
-    scan_kwargs: Dict[str, object] = {}
+    scan_kwargs: Dict[str, object] = {"TableName": table_name, "Segment": segment, "TotalSegments": total_segments}
+    scan_kwargs.update(extra_kwargs or {})
     while True:
-        response = table.scan(**scan_kwargs)
-        items.extend(response.get("Items", []))
+        response = client.scan(**scan_kwargs)
+        items.extend(_deserialize_item(item) for item in response.get("Items", []))
         last_key = response.get("LastEvaluatedKey")
         if not last_key:
             break
         scan_kwargs["ExclusiveStartKey"] = last_key
+    return items
+
+
+def _detect_epoch_attribute(client, table_name: str, created_attr: Optional[str] = None) -> Optional[str]:
+    """
+    Samples one item to find the createdAt attribute.
+    Returns None if the attribute is missing or not a DynamoDB Number (e.g. ISO strings).
+    """
+    sample = client.scan(TableName=table_name, Limit=1).get("Items", [])
+    if not sample:
+        return None
+    item = _deserialize_item(sample[0])
+    attr = created_attr or next((c for c in CREATED_AT_ALIASES if c in item), None)
+    if attr is None or not isinstance(item.get(attr), (int, float)):
+        return None
+    return attr
+
+
+def create_session(access_key: str, secret_key: str, region: str) -> boto3.session.Session:
+    """Build a boto3 session from explicit credentials."""
+    return boto3.session.Session(
+        aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_dynamodb_client():
+    """
+    Returns a process-wide DynamoDB client built once from load_env_credentials().
+    Reusing it keeps one connection pool (and TLS sessions) across every scan; the pool is
+    sized for three tables scanned concurrently with the default segment count.
+    """
+    access_key, secret_key, region = load_env_credentials()
+    session = create_session(access_key, secret_key, region)
+    config = Config(retries={"max_attempts": 10, "mode": "standard"}, max_pool_connections=32)
+    return session.client("dynamodb", config=config)
+
+
+def _scan_cache_settings() -> Tuple[str, int]:
+    """
+    Reads (cache dir, TTL seconds) from the environment at scan time, after .env is loaded.
+    A missing or non-integer VTC_SCAN_CACHE_TTL turns the cache off rather than failing.
+    """
+    load_dotenv()
+    cache_dir = os.getenv("VTC_SCAN_CACHE_DIR") or DEFAULT_SCAN_CACHE_DIR
+    try:
+        ttl_seconds = int(os.getenv("VTC_SCAN_CACHE_TTL", "0"))
+    except ValueError:
+        ttl_seconds = 0
+    return cache_dir, ttl_seconds
+
+
+def _prune_scan_cache(cache_dir: str, ttl_seconds: int) -> None:
+    """Deletes cache (and leftover temp) files older than ttl_seconds."""
+    cutoff = time.time() - ttl_seconds
+    for pattern in ("*.parquet", "*.tmp"):
+        for stale_path in glob.glob(os.path.join(cache_dir, pattern)):
+            try:
+                if os.path.getmtime(stale_path) < cutoff:
+                    os.remove(stale_path)
+            except OSError:
+                pass  # Already removed by a concurrent writer.
+
+
+def _disk_cached_scan(func):
+    """
+    Parquet disk cache for get_data_from_dynamodb (it reads that function's parameters by name).
+    Entries live under VTC_SCAN_CACHE_DIR for VTC_SCAN_CACHE_TTL seconds, keyed on (table, region,
+    date range, created_attr, projection, UTC day); expired entries are pruned on each write.
+    Cache read/write failures (e.g. pyarrow missing, or item attributes parquet can't
+    represent) fall back to a plain scan.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache_dir, ttl_seconds = _scan_cache_settings()
+        if ttl_seconds <= 0:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = bound.arguments
+        session, client = params["session"], params["client"]
+        region = params["region"]
+        if region is None and client is not None:
+            region = client.meta.region_name
+        elif region is None and session is not None:
+            region = session.region_name
+        today = datetime.now(UTC).strftime("%Y-%m-%d")
+        key_src = "|".join(
+            str(v) for v in (
+                params["table_name"], region, params["start_ts"], params["end_ts"],
+                params["created_attr"], params["projection"], today,
+            )
+        )
+        key = hashlib.blake2b(key_src.encode(), digest_size=16).hexdigest()
+        path = os.path.join(cache_dir, f"{key}.parquet")
+
+        try:
+            if time.time() - os.path.getmtime(path) < ttl_seconds:
+                return attach_columns(pd.read_parquet(path, engine="pyarrow"))
+        except Exception:
+            pass  # Missing, stale-check failed, or unreadable: rescan below.
+
+        df = func(*args, **kwargs)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            _prune_scan_cache(cache_dir, ttl_seconds)
+            df.to_parquet(tmp_path, engine="pyarrow", index=False)
+            os.replace(tmp_path, path)  # Atomic, so readers never see a partial file.
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return df
+
+    return wrapper
+
+
+@_disk_cached_scan
+def get_data_from_dynamodb(
+    table_name: str,
+    access_key: Optional[str] = None,
+    secret_key: Optional[str] = None,
+    region: Optional[str] = None,
+    total_segments: int = 8,
+    session: Optional[boto3.session.Session] = None,
+    start_ts: Optional[pd.Timestamp] = None,
+    end_ts: Optional[pd.Timestamp] = None,
+    created_attr: Optional[str] = None,
+    projection: Optional[List[str]] = None,
+    client=None,
+) -> pd.DataFrame:
+    """
+    Scan a DynamoDB table in parallel segments and return results as a pandas DataFrame.
+    - Pass a prebuilt `client` (e.g. get_dynamodb_client()) or `session` to share it across scans.
+    - Otherwise a client is built from the given credentials, or the shared one is used
+      when no credentials are given.
+    - With start_ts/end_ts, rows outside the range are filtered server-side when the
+      createdAt attribute is an epoch Number; otherwise the full table is returned.
+    - With projection, only those attributes are fetched (see TABLE_PROJECTIONS).
+    """
+    if client is None:
+        if session is None and access_key is None:
+            client = get_dynamodb_client()
+        else:
+            if session is None:
+                session = create_session(access_key, secret_key, region)
+            # Give every segment its own HTTP connection so the pool doesn't serialize requests.
+            config = Config(
+                retries={"max_attempts": 10, "mode": "standard"},
+                max_pool_connections=total_segments + 4,
+            )
+            # The low-level client is thread-safe and lets us deserialize numbers natively.
+            client = session.client("dynamodb", config=config)
+    extra_kwargs: Dict[str, object] = {}
+    attribute_names: Dict[str, str] = {}
+    if projection:
+        # Placeholders keep reserved words such as "name" and "timestamp" legal.
+        projected = {f"#p{i}": name for i, name in enumerate(dict.fromkeys(projection))}
+        attribute_names.update(projected)
+        extra_kwargs["ProjectionExpression"] = ",".join(projected)
+    if start_ts is not None and end_ts is not None:
+        attr = _detect_epoch_attribute(client, table_name, created_attr)
+        if attr:
+            # Match the range in both epoch seconds and milliseconds. The two ranges can't overlap,
+            # so no row is dropped whatever unit it uses; coerce_created_at then picks the unit
+            # from the whole column as before, instead of trusting a one-item sample here.
+            attribute_names["#created"] = attr
+            extra_kwargs["FilterExpression"] = (
+                "(#created BETWEEN :start_s AND :end_s) OR (#created BETWEEN :start_ms AND :end_ms)"
+            )
+            # Timestamp.value is in nanoseconds.
+            extra_kwargs["ExpressionAttributeValues"] = {
+                ":start_s": {"N": str(start_ts.value // 10**9)},
+                ":end_s": {"N": str(end_ts.value // 10**9)},
+                ":start_ms": {"N": str(start_ts.value // 10**6)},
+                ":end_ms": {"N": str(end_ts.value // 10**6)},
+            }
+    if attribute_names:
+        extra_kwargs["ExpressionAttributeNames"] = attribute_names
+    results: List[List[dict]] = []
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        futures = [
+            executor.submit(_scan_segment, client, table_name, segment, total_segments, extra_kwargs)
+            for segment in range(total_segments)
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+    items = list(itertools.chain.from_iterable(results))
     if not items:
-        return pd.DataFrame()
-    return pd.DataFrame(items)
+        return attach_columns(pd.DataFrame())
+    return attach_columns(pd.DataFrame(items))
 
 
 def _find_first_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
@@ -144,34 +392,132 @@ def _find_first_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]
     return None
 
 
+def resolve_columns(df: pd.DataFrame) -> Dict[str, Optional[str]]:
+    """Maps each COLUMN_ALIASES role to the first matching column of df (or None)."""
+    present = set(df.columns)
+    return {
+        role: next((c for c in aliases if c in present), None)
+        for role, aliases in COLUMN_ALIASES.items()
+    }
+
+
+def attach_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Resolves the alias columns once and stores them in df.attrs['cols'] for the helpers below."""
+    df.attrs["cols"] = resolve_columns(df)
+    return df
+
+
+def _column(df: pd.DataFrame, role: str) -> Optional[str]:
+    """
+    Looks up a role's column from df.attrs['cols'], resolving on the fly otherwise.
+    attrs survive column subsets and renames, so a stored name is only trusted if still present.
+    """
+    col = df.attrs.get("cols", {}).get(role)
+    if col is not None and col in df.columns:
+        return col
+    return _find_first_column(df, COLUMN_ALIASES[role])
+
+
+def _to_datetime_by_unique(values: pd.Series, max_unique_ratio: float = 1.0, **kwargs) -> pd.Series:
+    """
+    Runs pd.to_datetime over the distinct values only, then gathers the results back.
+    Log tables repeat timestamps heavily, so this parses O(unique) values instead of O(rows).
+    Falls back to a direct conversion when the distinct ratio is at or above max_unique_ratio.
+    """
+    codes, uniques = pd.factorize(values, sort=False)
+    if len(uniques) >= max_unique_ratio * len(values):
+        return pd.to_datetime(values, **kwargs)
+    parsed = pd.to_datetime(pd.Index(uniques), **kwargs)
+    # Missing values are factorized to -1; fill those with NaT rather than wrapping around.
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=values.index)
+
+
+def _valid_fraction_and_max(values: pd.Series) -> Tuple[float, float]:
+    """Returns (fraction of non-NaN values, max ignoring NaN) from the raw ndarray."""
+    arr = values.to_numpy()
+    if arr.dtype.kind in "iu":
+        # Integer columns cannot hold NaN: a single max reduction is enough.
+        return 1.0, float(arr.max())
+    if arr.dtype.kind != "f":
+        arr = values.to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~np.isnan(arr)
+    return float(valid.mean()), float(arr.max(where=valid, initial=-np.inf))
+
+
+def _fast_epoch_ms(df: pd.DataFrame, created_col: Optional[str]) -> Optional[np.ndarray]:
+    """
+    Returns createdAt as an int64 epoch-milliseconds array when it matches OAK's layout
+    (numpy integer dtype, first value in the ms range), else None. Disabled by OAK_FAST_DATETIME=0.
+    """
+    if not OAK_FAST_DATETIME or created_col != "createdAt" or df.empty:
+        return None
+    column = df[created_col]
+    # Nullable extension dtypes (e.g. Int64 with <NA>) can't be cast to int64; leave them to the generic path.
+    if not isinstance(column.dtype, np.dtype) or column.dtype.kind not in "iu":
+        return None
+    arr = column.to_numpy(dtype="int64")
+    return arr if arr[0] > 1e12 else None
+
+
+def _epoch_ms_mask(ts_ms: np.ndarray, lo_ms: int, hi_ms: int) -> np.ndarray:
+    """Inclusive range mask over epoch-millisecond ints."""
+    return (ts_ms >= lo_ms) & (ts_ms <= hi_ms)
+
+
 # [FIXED] This function is now robust and correctly handles the Unix timestamps
 # stored as 'object' or 'Decimal' types from DynamoDB.
-def coerce_created_at(df: pd.DataFrame) -> pd.DataFrame:
-    """Converts various timestamp formats into a timezone-aware UTC datetime column."""
+def coerce_created_at(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    """
+    Converts various timestamp formats into a timezone-aware UTC datetime column.
+    - Pass inplace=True when the caller owns the frame to skip the defensive copy.
+    """
     if df.empty:
         return df
-    created_col = _find_first_column(df, CREATED_AT_ALIASES)
+    created_col = _column(df, "created_at")
     if not created_col:
         return df
 
-    df = df.copy()
+    if not inplace:
+        df = df.copy()
 
-    # First, attempt to convert the column to a numeric type. This will handle
-    # Decimals, numbers stored as strings, etc. 'coerce' turns failures into NaT.
-    numeric_timestamps = pd.to_numeric(df[created_col], errors='coerce')
+    column = df[created_col]
+    if pd.api.types.is_datetime64_any_dtype(column):
+        # Already parsed (e.g. read back from the parquet cache): nothing to convert.
+        # Aware columns in another zone are converted; naive ones are assumed to be UTC.
+        df["createdAt_dt"] = column.dt.tz_convert("UTC") if column.dt.tz is not None else column.dt.tz_localize("UTC")
+        return df
 
-    # Check if the conversion to numeric was successful for most of the data.
-    if numeric_timestamps.notna().mean() > 0.5:
+    ts_ms = _fast_epoch_ms(df, created_col)
+    if ts_ms is not None:
+        # Skip the unit scan and de-duplication for OAK's epoch-millisecond layout.
+        df["createdAt_dt"] = pd.to_datetime(ts_ms, unit='ms', utc=True, errors='coerce')
+        return df
+
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        # Scans deserialize Numbers natively, so skip the to_numeric pass and validity check.
+        numeric_timestamps = column
+        _, max_ts = _valid_fraction_and_max(numeric_timestamps)
+        is_numeric = True
+    else:
+        # Attempt to convert the column to a numeric type. This will handle
+        # Decimals, numbers stored as strings, etc. 'coerce' turns failures into NaT.
+        numeric_timestamps = pd.to_numeric(column, errors='coerce')
+        # Check if the conversion to numeric was successful for most of the data.
+        valid_frac, max_ts = _valid_fraction_and_max(numeric_timestamps)
+        is_numeric = valid_frac > 0.5
+
+    if is_numeric:
         # Data is numeric (Unix timestamp). Now determine if it's seconds or milliseconds.
         # Heuristic: if the max value is larger than a plausible seconds value for the next 50 years,
         # assume it's milliseconds. 1e12 is a safe threshold.
-        if numeric_timestamps.max() > 1e12:
-             coerced = pd.to_datetime(numeric_timestamps, unit='ms', utc=True, errors='coerce')
-        else:
-             coerced = pd.to_datetime(numeric_timestamps, unit='s', utc=True, errors='coerce')
+        unit = 'ms' if max_ts > 1e12 else 's'
+        # Only worth de-duplicating when timestamps repeat a lot.
+        coerced = _to_datetime_by_unique(
+            numeric_timestamps, max_unique_ratio=0.5, unit=unit, utc=True, errors='coerce'
+        )
     else:
         # If the data is not numeric, it must be string-based (e.g., ISO 8601 format).
-        coerced = pd.to_datetime(df[created_col], utc=True, errors='coerce')
+        coerced = _to_datetime_by_unique(column, utc=True, errors='coerce')
 
     df["createdAt_dt"] = coerced
     return df
@@ -181,41 +527,95 @@ def filter_by_date(df: pd.DataFrame, start_dt: pd.Timestamp, end_dt: pd.Timestam
     """Filters a DataFrame between a start and end timezone-aware timestamp."""
     if df.empty:
         return df
+    ts_ms = _fast_epoch_ms(df, _column(df, "created_at"))
+    if ts_ms is not None:
+        # Compare raw epoch-ms ints against the bounds; no datetime array needed.
+        lo_ms = -(-start_dt.value // 10**6)  # ceil, so sub-ms start bounds stay inclusive-exact
+        hi_ms = end_dt.value // 10**6
+        return df.loc[_epoch_ms_mask(ts_ms, lo_ms, hi_ms)]
     if "createdAt_dt" not in df.columns:
         df = coerce_created_at(df)
     if "createdAt_dt" not in df.columns or df["createdAt_dt"].isna().all():
         # If column is still missing or all values are invalid, return empty.
         return df.iloc[0:0]
     mask = (df["createdAt_dt"] >= start_dt) & (df["createdAt_dt"] <= end_dt)
-    return df.loc[mask].copy()
+    # No defensive copy: downstream helpers derive new columns via assign/Series, never mutate.
+    return df.loc[mask]
 
 
-def count_usage_by_account(usage_df: pd.DataFrame, usage_types: List[str]) -> pd.DataFrame:
-    if usage_df.empty or not usage_types:
-        return pd.DataFrame(columns=["account", "count"])
-    account_col = _find_first_column(usage_df, ACCOUNT_ALIASES)
-    usage_type_col = _find_first_column(usage_df, USAGE_TYPE_ALIASES)
-    if not account_col or not usage_type_col:
-        return pd.DataFrame(columns=["account", "count"])
-    df_norm = usage_df.copy()
-    df_norm[account_col] = df_norm[account_col].astype(str).str.strip().str.lower()
-    subset = df_norm[df_norm[usage_type_col].isin(usage_types)]
-    grouped = subset.groupby(account_col).size().reset_index(name="count")
-    grouped = grouped.rename(columns={account_col: "account"})
-    return grouped
+def _account_keys(df: pd.DataFrame) -> Optional[pd.Series]:
+    """Returns the normalized account key Series, reusing ACCOUNT_KEY if already present."""
+    if ACCOUNT_KEY in df.columns:
+        return df[ACCOUNT_KEY]
+    account_col = _column(df, "account")
+    if not account_col:
+        return None
+    return df[account_col].astype(str).str.strip().str.lower().astype("category").rename(ACCOUNT_KEY)
+
+
+def encode_log_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepares a usage/AskAI log frame for counting.
+    - Adds the normalized account key (categorical).
+    - Casts the usage type column to categorical so groupby hashes int codes, not strings.
+    """
+    if df.empty:
+        return df
+    # Collect both columns first so the frame is copied at most once.
+    new_columns: Dict[str, pd.Series] = {}
+    if ACCOUNT_KEY not in df.columns:
+        keys = _account_keys(df)
+        if keys is not None:
+            new_columns[ACCOUNT_KEY] = keys
+    usage_type_col = _column(df, "usage_type")
+    if usage_type_col and not isinstance(df[usage_type_col].dtype, pd.CategoricalDtype):
+        new_columns[usage_type_col] = df[usage_type_col].astype("category")
+    return df.assign(**new_columns) if new_columns else df
+
+
+def count_usage_by_metric(usage_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Counts usage rows per account for every metric in one groupby.
+    Returns accounts as the index and one column per METRICS_USAGE_TYPE_MAP key.
+    """
+    empty = pd.DataFrame(0, index=pd.Index([], name=ACCOUNT_KEY, dtype=object), columns=list(METRICS_USAGE_TYPE_MAP))
+    if usage_df.empty:
+        return empty
+    acct = _account_keys(usage_df)
+    usage_type_col = _column(usage_df, "usage_type")
+    if acct is None or not usage_type_col:
+        return empty
+    metric = pd.Series(
+        pd.Categorical(usage_df[usage_type_col].map(USAGE_TYPE_TO_METRIC), categories=list(METRICS_USAGE_TYPE_MAP)),
+        index=usage_df.index,
+        name="metric",
+    )
+    mask = metric.notna()
+    if not mask.any():
+        return empty
+    counts = metric[mask].groupby([acct[mask], metric[mask]], observed=True).size()
+    pivot = counts.unstack("metric", fill_value=0).reindex(columns=list(METRICS_USAGE_TYPE_MAP), fill_value=0)
+    # Hand back plain labels so merging into the report doesn't carry categorical axes along.
+    pivot.columns = list(METRICS_USAGE_TYPE_MAP)
+    pivot.index = pivot.index.astype(object)
+    return pivot
+
+
+def _value_counts_frame(keys: pd.Series) -> pd.DataFrame:
+    """Counts rows per account key as an (account, count) frame; value_counts skips groupby overhead."""
+    counts = keys.value_counts(sort=False)
+    # Categorical keys also report unobserved categories with a zero count.
+    counts = counts[counts > 0]
+    return counts.rename_axis("account").reset_index(name="count")
 
 
 def count_askai_by_account(askai_df: pd.DataFrame) -> pd.DataFrame:
     if askai_df.empty:
         return pd.DataFrame(columns=["account", "count"])
-    account_col = _find_first_column(askai_df, ACCOUNT_ALIASES)
-    if not account_col:
+    acct = _account_keys(askai_df)
+    if acct is None:
         return pd.DataFrame(columns=["account", "count"])
-    df_norm = askai_df.copy()
-    df_norm[account_col] = df_norm[account_col].astype(str).str.strip().str.lower()
-    grouped = df_norm.groupby(account_col).size().reset_index(name="count")
-    grouped = grouped.rename(columns={account_col: "account"})
-    return grouped
+    return _value_counts_frame(acct)
 
 
 def build_report_dataframe(
@@ -228,8 +628,8 @@ def build_report_dataframe(
         ]
         return pd.DataFrame(columns=columns)
     base = accounts_df.copy()
-    acct_col = _find_first_column(base, ACCOUNT_ALIASES)
-    user_col = _find_first_column(base, USERNAME_ALIASES)
+    acct_col = _column(accounts_df, "account")
+    user_col = _column(accounts_df, "username")
     if acct_col and acct_col != "account":
         base = base.rename(columns={acct_col: "account"})
     if user_col and user_col != "username":
@@ -241,47 +641,80 @@ def build_report_dataframe(
     base["account"] = base["account"].astype(str).str.strip().str.lower()
     base = base[~base["account"].str.endswith("@thinkcol.com", na=False)]
     report = base[["account", "username"]].rename(columns={"account": "Account", "username": "Username"}).copy()
-    for metric_name, usage_types in METRICS_USAGE_TYPE_MAP.items():
-        grouped = count_usage_by_account(usage_df, usage_types)
-        grouped = grouped.rename(columns={"account": "Account", "count": metric_name})
-        report = report.merge(grouped, on="Account", how="left")
+    # Encode log columns once and count every metric in a single groupby + merge.
+    usage_df = encode_log_columns(usage_df)
+    askai_df = encode_log_columns(askai_df)
+    report = report.merge(count_usage_by_metric(usage_df), left_on="Account", right_index=True, how="left")
     askai_grouped = count_askai_by_account(askai_df).rename(columns={"account": "Account", "count": "AskAI Questions"})
     report = report.merge(askai_grouped, on="Account", how="left")
     columns_to_fill = [
         "Logins", "Uploads", "Generated Transcripts", "Regenerated Transcripts", "Initial Summaries",
         "Regenerated Summaries", "Regenerated Notes", "AskAI Questions"
     ]
-    for col in columns_to_fill:
-        if col not in report.columns:
-            report[col] = 0
-        report[col] = report[col].fillna(0).astype(int)
+    # One reindex adds any missing metric column (as 0) and fixes the column order;
+    # then fill and cast every metric column as a single block.
+    report = report.reindex(columns=["Account", "Username", *columns_to_fill], fill_value=0)
+    report[columns_to_fill] = report[columns_to_fill].fillna(0).astype("int64")
     if "Username" in report.columns:
         report = report.sort_values(by=["Username", "Account"], kind="stable", na_position="last").reset_index(drop=True)
     else:
         report = report.sort_values(by=["Account"], kind="stable").reset_index(drop=True)
-    report = report[[
-        "Account", "Username", "Logins", "Uploads", "Generated Transcripts", "Regenerated Transcripts",
-        "Initial Summaries", "Regenerated Summaries", "Regenerated Notes", "AskAI Questions",
-    ]]
     return report
 
 
 def export_excel(df: pd.DataFrame) -> bytes:
     """Exports a DataFrame to an in-memory Excel file (bytes)."""
+    import xlsxwriter
+
     output = io.BytesIO()
-    # Use the 'xlsxwriter' engine for better compatibility
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='VTC Usage Report')
+    # Write rows straight through xlsxwriter; constant_memory flushes each row as it is written.
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('VTC Usage Report')
+    bold = workbook.add_format({'bold': True})
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], bold)
+    # xlsxwriter rejects NaN, so write missing values as blank cells like to_excel did.
+    cells = df.astype(object).where(df.notna(), None)
+    for r_idx, row in enumerate(cells.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(r_idx, 0, row)
+    workbook.close()
     # Get the content of the BytesIO object
     data = output.getvalue()
     return data
 
 
+def _build_table_xml(columns: List[str], values, col_width: int) -> str:
+    """Builds a "Table Grid" styled <w:tbl> with a bold header row; col_width is in twips."""
+    from docx.oxml.ns import nsdecls
+
+    tc_pr = f'<w:tcPr><w:tcW w:type="dxa" w:w="{col_width}"/></w:tcPr>'
+
+    def cell(text: str, bold: bool = False) -> str:
+        r_pr = "<w:rPr><w:b/></w:rPr>" if bold else ""
+        return (
+            f'<w:tc>{tc_pr}<w:p><w:r>{r_pr}'
+            f'<w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p></w:tc>'
+        )
+
+    parts = [
+        f"<w:tbl {nsdecls('w')}>",
+        '<w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+        'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>',
+        "<w:tblGrid>" + f'<w:gridCol w:w="{col_width}"/>' * len(columns) + "</w:tblGrid>",
+        "<w:tr>" + "".join(cell(col, bold=True) for col in columns) + "</w:tr>",
+    ]
+    for row_vals in values:
+        parts.append("<w:tr>" + "".join(cell(str(v)) for v in row_vals) + "</w:tr>")
+    parts.append("</w:tbl>")
+    return "".join(parts)
+
+
 def export_docx(df: pd.DataFrame, start_dt: pd.Timestamp, end_dt: pd.Timestamp) -> bytes:
     """Exports a DataFrame to an in-memory DOCX file (bytes)."""
     from docx import Document
     from docx.shared import Inches
     from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import parse_xml
 
     output = io.BytesIO()
     doc = Document()
@@ -308,18 +741,20 @@ def export_docx(df: pd.DataFrame, start_dt: pd.Timestamp, end_dt: pd.Timestamp)
     doc.add_paragraph("") # Spacer
 
     # --- Table ---
-    columns = list(df.columns)
-    table = doc.add_table(rows=len(df) + 1, cols=len(columns))
-    table.style = "Table Grid"
-
-    hdr_cells = table.rows[0].cells
-    for idx, col in enumerate(columns):
-        hdr_run = hdr_cells[idx].paragraphs[0].add_run(str(col))
-        hdr_run.bold = True
-
-    for r_idx, (_, row) in enumerate(df.iterrows(), start=1):
-        for c_idx, col in enumerate(columns):
-            table.rows[r_idx].cells[c_idx].text = str(row[col]) if pd.notna(row[col]) else ""
+    # Emitted as one <w:tbl> XML string; python-docx's per-cell object model is far slower for big tables.
+    section = doc.sections[-1]
+    text_width = section.page_width - section.left_margin - section.right_margin
+    columns = [str(col) for col in df.columns]
+    col_width = int(text_width / 635 / max(len(columns), 1))  # EMU -> twips
+    int_cols = df.select_dtypes(include="integer").columns
+    values = df.astype({c: "string" for c in int_cols}).to_numpy(dtype=object, na_value="")
+    tbl = parse_xml(_build_table_xml(columns, values, col_width))
+    # Keep the table ahead of the trailing section properties, as python-docx's add_table does.
+    body = doc.element.body
+    if body.sectPr is not None:
+        body.sectPr.addprevious(tbl)
+    else:
+        body.append(tbl)
 
     # Save the document to the in-memory stream
     doc.save(output)
@@ -336,11 +771,20 @@ def main() -> None:
         default_name = f"vtc_report_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.docx"
     output_path = args.output or default_name
 
-    access_key, secret_key, region = load_env_credentials()
+    # One shared client (and connection pool) for all three scans.
+    client = get_dynamodb_client()
 
-    accounts_df = get_data_from_dynamodb(TABLE_ACCOUNTS, access_key, secret_key, region)
-    usage_df_all = get_data_from_dynamodb(TABLE_USAGE, access_key, secret_key, region)
-    askai_df_all = get_data_from_dynamodb(TABLE_ASKAI, access_key, secret_key, region)
+    accounts_df = get_data_from_dynamodb(
+        TABLE_ACCOUNTS, client=client, projection=TABLE_PROJECTIONS[TABLE_ACCOUNTS]
+    )
+    # Let DynamoDB drop out-of-range log rows unless date filtering is disabled.
+    scan_range = {} if args.no_date_filter else {"start_ts": start_dt, "end_ts": end_dt}
+    usage_df_all = get_data_from_dynamodb(
+        TABLE_USAGE, client=client, projection=TABLE_PROJECTIONS[TABLE_USAGE], **scan_range
+    )
+    askai_df_all = get_data_from_dynamodb(
+        TABLE_ASKAI, client=client, projection=TABLE_PROJECTIONS[TABLE_ASKAI], **scan_range
+    )
 
     if args.no_date_filter:
         usage_df = coerce_created_at(usage_df_all)
@@ -353,12 +797,14 @@ def main() -> None:
         print("--- DEBUG INFO ---")
         print(f"Date Range: {start_dt} to {end_dt}")
         print(f"Accounts Fetched: {len(accounts_df)}")
-        print(f"Total Usage Rows Fetched: {len(usage_df_all)}")
+        # With date filtering on, the scans are already filtered server-side.
+        fetched_label = "Rows Fetched" if args.no_date_filter else "Rows Fetched (server-side date filtered)"
+        print(f"Usage {fetched_label}: {len(usage_df_all)}")
         print(f"Usage Rows After Filtering: {len(usage_df)}")
-        print(f"Total AskAI Rows Fetched: {len(askai_df_all)}")
+        print(f"AskAI {fetched_label}: {len(askai_df_all)}")
         print(f"AskAI Rows After Filtering: {len(askai_df)}")
         if not usage_df.empty:
-            ut_col = _find_first_column(usage_df, USAGE_TYPE_ALIASES)
+            ut_col = _column(usage_df, "usage_type")
             if ut_col:
                 print(f"\nValue counts of '{ut_col}' in FILTERED data:")
                 print(usage_df[ut_col].value_counts())